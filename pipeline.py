@@ -0,0 +1,25 @@
+import os
+from src.cleaner import run_cleaning_pipeline
+from src.model import run_clustering
+
+def run_full_pipeline(raw_file, output_centroids_file, k=10, cache_file=None):
+    """
+    Cleans the raw data and clusters it in one process, handing the cleaned
+    DataFrame straight to K-Means instead of writing it out and reading it back.
+    The Parquet file is only written if cache_file is given.
+    """
+    df = run_cleaning_pipeline(raw_file, cache_file, return_frame=True)
+    if df is None or df.empty:
+        print("[!] No accidents left after cleaning. Nothing to cluster.")
+        return
+    run_clustering(df, output_centroids_file, k=k)
+
+if __name__ == "__main__":
+    base_dir = os.path.abspath(os.path.dirname(__file__))
+
+    raw_data_path = os.path.join(base_dir, 'data', 'raw', 'indian_road_accidents.csv')
+    processed_data_path = os.path.join(base_dir, 'data', 'processed', 'accidents_clean.parquet')
+    centroids_data_path = os.path.join(base_dir, 'data', 'processed', 'cluster_centroids.csv')
+
+    # Keep the cleaned Parquet as a cache so model.py can still be re-run on its own
+    run_full_pipeline(raw_data_path, centroids_data_path, k=500, cache_file=processed_data_path)
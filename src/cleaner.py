@@ -1,60 +1,178 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import gc
 import os
 
-def load_data(filepath):
+# Only the columns the pipeline actually touches are parsed from the raw file
+RAW_COLUMNS = ['Latitude', 'Longitude', 'Date', 'Severity']
+# Date is carried through untouched: read it as text so a chunk of bare years
+# or 20200101-style values can't come out numeric and break the Parquet schema
+RAW_DTYPES = {'Date': 'str'}
+CHUNK_SIZE = 1_000_000
+
+# Arrow types of the cleaned columns. Fixed up front so an empty or all-null
+# first chunk can't pin a column to Arrow's `null` type for the whole file.
+CLEAN_TYPES = {
+    'Latitude': pa.float32(),
+    'Longitude': pa.float32(),
+    'Date': pa.string(),
+    'Severity': pa.dictionary(pa.int8(), pa.string())
+}
+
+def load_data(filepath, chunksize=CHUNK_SIZE):
+    """Returns an iterator of DataFrame chunks instead of the whole file."""
     print(f"[*] Loading dataset from {filepath}...")
     try:
-        df = pd.read_csv(filepath)
-        return df
+        reader = pd.read_csv(
+            filepath,
+            usecols=lambda col: col in RAW_COLUMNS,
+            dtype=RAW_DTYPES,
+            chunksize=chunksize,
+            engine='c'
+        )
+        return reader
     except FileNotFoundError:
         print("[!] Error: File not found.")
         return None
 
-def clean_coordinates(df):
-    initial_count = len(df)
-    df_clean = df.dropna(subset=['Latitude', 'Longitude'])
-    df_clean.loc[:, 'Latitude'] = pd.to_numeric(df_clean['Latitude'], errors='coerce')
-    df_clean.loc[:, 'Longitude'] = pd.to_numeric(df_clean['Longitude'], errors='coerce')
-    df_clean = df_clean.dropna(subset=['Latitude', 'Longitude'])
-    print(f"[*] Dropped {initial_count - len(df_clean)} rows with bad coordinates.")
-    return df_clean
+def _coordinate_array(series):
+    # Text columns still need the slow coercion; numeric ones go straight to NumPy
+    if series.dtype.kind == 'O':
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype=np.float32, na_value=np.nan)
+
+def _coordinate_arrays(df):
+    """Returns (df, lat, lon), writing coerced/downcast values back only if needed."""
+    lat = _coordinate_array(df['Latitude'])
+    lon = _coordinate_array(df['Longitude'])
+    # Coordinates are read with default inference (a forced float dtype would abort
+    # the whole ingest on one 'N/A'), so every chunk is normalised to float32 here
+    if df['Latitude'].dtype != np.float32 or df['Longitude'].dtype != np.float32:
+        df = df.assign(Latitude=lat, Longitude=lon)
+    return df, lat, lon
+
+def _bbox_mask(lat, lon, lat_bounds, lon_bounds):
+    # Write every comparison into one reused scratch buffer and AND it in place,
+    # instead of allocating four temporary masks plus their chained results
+    mask = np.greater_equal(lat, lat_bounds[0])
+    scratch = np.empty_like(mask)
+    mask &= np.less_equal(lat, lat_bounds[1], out=scratch)
+    mask &= np.greater_equal(lon, lon_bounds[0], out=scratch)
+    mask &= np.less_equal(lon, lon_bounds[1], out=scratch)
+    return mask
+
+def _apply_mask(df, mask):
+    """Slices df once; returns (df_kept, dropped_count) from a single popcount."""
+    kept = int(np.count_nonzero(mask))
+    return df.iloc[mask], len(mask) - kept
 
 def normalize_data(df):
     # Map Kaggle numeric severities if they exist, otherwise fill unknowns
     severity_mapping = {1.0: 'Fatal', 2.0: 'Grievous Injury', 3.0: 'Minor Damage'}
-    if 'Severity' in df.columns and df['Severity'].dtype == 'float64':
+    # Checked per chunk, so a chunk with no missing values (int64) must map too
+    if 'Severity' in df.columns and pd.api.types.is_numeric_dtype(df['Severity']):
         df['Severity'] = df['Severity'].map(severity_mapping).fillna('Unknown')
     elif 'Severity' in df.columns:
          df['Severity'] = df['Severity'].fillna('Unknown')
+    # A handful of labels: store small integer codes instead of one string per row
+    if 'Severity' in df.columns:
+        df['Severity'] = df['Severity'].astype('category')
     return df
 
-def filter_city_limits(df, lat_bounds, lon_bounds):
-    df_filtered = df[
-        (df['Latitude'] >= lat_bounds[0]) & (df['Latitude'] <= lat_bounds[1]) &
-        (df['Longitude'] >= lon_bounds[0]) & (df['Longitude'] <= lon_bounds[1])
-    ]
-    print(f"[*] Filtered dataset down to {len(df_filtered)} regional accidents.")
-    return df_filtered
-
-def run_cleaning_pipeline(input_file, output_file):
-    df = load_data(input_file)
-    if df is None: return
-    df = clean_coordinates(df)
-    df = normalize_data(df)
+def _filter_rows(df, lat_bounds, lon_bounds):
+    """
+    Drops rows with missing/unparsable coordinates or outside the bounding box,
+    using one fused boolean mask so the frame is copied only once.
+    Returns (df_filtered, bad_coordinate_count, kept_count) for this chunk.
+    """
+    df, lat, lon = _coordinate_arrays(df)
+    finite = np.isfinite(lat) & np.isfinite(lon)
+    mask = _bbox_mask(lat, lon, lat_bounds, lon_bounds)
+    mask &= finite
+    df_filtered, dropped = _apply_mask(df, mask)
+    bad = len(finite) - int(np.count_nonzero(finite))
+    return df_filtered, bad, len(mask) - dropped
+
+def _clean_schema(columns):
+    return pa.schema([(col, CLEAN_TYPES[col]) for col in columns])
+
+def run_cleaning_pipeline(input_file, output_file=None, return_frame=False):
+    """
+    Cleans the raw file chunk by chunk. Saves Parquet if output_file is given;
+    with return_frame=True the cleaned data is also returned as one DataFrame.
+    """
+    reader = load_data(input_file)
+    if reader is None: return
     
     # --- THE INDIA BOUNDING BOX ---
     india_lat_bounds = (8.0, 38.0)
     india_lon_bounds = (68.0, 98.0)
-    df = filter_city_limits(df, india_lat_bounds, india_lon_bounds)
     
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_csv(output_file, index=False)
-    print(f"--- SUCCESS: Cleaned data saved to {output_file} ---")
+    if output_file is not None:
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    
+    # Stream the raw file: only one chunk is ever held in memory.
+    # Each cleaned chunk becomes one row group of the Parquet output, written to a
+    # temp file so a failure mid-file never replaces the previous good output.
+    tmp_file = output_file + '.tmp' if output_file is not None else None
+    writer = None
+    frames = []
+    bad_total = kept_total = 0
+    try:
+        with reader:
+            for chunk in reader:
+                df, bad, kept = _filter_rows(chunk, india_lat_bounds, india_lon_bounds)
+                bad_total += bad
+                kept_total += kept
+                del chunk
+                df = normalize_data(df)
+                if return_frame:
+                    frames.append(df)
+                if output_file is not None:
+                    # Opened on the first chunk even if it is empty, so a file with
+                    # no surviving rows still produces a valid, empty Parquet file
+                    if writer is None:
+                        writer = pq.ParquetWriter(
+                            tmp_file, _clean_schema(df.columns), compression='snappy'
+                        )
+                    if not df.empty:
+                        table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+                        writer.write_table(table)
+                        del table
+                
+                # Free this chunk (and any pandas reference cycles) before the
+                # reader parses the next one. When only writing Parquet this keeps
+                # two chunks from coexisting; with return_frame=True, `frames`
+                # still holds every cleaned chunk by design.
+                del df
+                gc.collect()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_file, output_file)
+    print(f"[*] Dropped {bad_total} rows with bad coordinates.")
+    print(f"[*] Filtered dataset down to {kept_total} regional accidents.")
+    if output_file is not None:
+        print(f"--- SUCCESS: Cleaned data saved to {output_file} ---")
+    
+    if return_frame and frames:
+        df = pd.concat(frames, ignore_index=True)
+        # Chunks carry their own Severity categories, which concat turns back into strings
+        if 'Severity' in df.columns:
+            df['Severity'] = df['Severity'].astype('category')
+        return df
 
 if __name__ == "__main__":
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     
     raw_data_path = os.path.join(base_dir, 'data', 'raw', 'indian_road_accidents.csv')
-    processed_data_path = os.path.join(base_dir, 'data', 'processed', 'accidents_clean.csv')
+    processed_data_path = os.path.join(base_dir, 'data', 'processed', 'accidents_clean.parquet')
     
     run_cleaning_pipeline(raw_data_path, processed_data_path)
\ No newline at end of file
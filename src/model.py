@@ -1,100 +1,292 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+import pyarrow.parquet as pq
+from sklearn.cluster import KMeans, kmeans_plusplus
 import os
 
+# Up to this many clusters a plain NumPy Lloyd loop beats sklearn's per-call overhead
+SMALL_K = 16
+
+# ~11m grid. _grid_cells collapses each cell to one weighted point, so all
+# accidents in a cell are forced into the same cluster - an ~11m approximation
+GRID_SCALE = 1e4
+
+# Clustering only needs the coordinates, plus Severity for the risk score
+MODEL_COLUMNS = ['Latitude', 'Longitude', 'Severity']
+MODEL_DTYPES = {'Latitude': 'float32', 'Longitude': 'float32'}
+
+# Float32 (lat, lon, severity weight) rows cached next to the cleaned Parquet file
+SIDECAR_COLUMNS = ['Latitude', 'Longitude', 'Severity_Weight']
+
+def _sidecar_path(filepath):
+    return os.path.splitext(filepath)[0] + '.f32.bin'
+
+def _load_sidecar(filepath):
+    """
+    Memory-maps the sidecar if it is newer than the cleaned Parquet file and
+    holds exactly one row per accident in it, else None.
+    """
+    if not filepath.endswith('.parquet'):
+        return None
+    sidecar = _sidecar_path(filepath)
+    try:
+        if os.path.getmtime(sidecar) < os.path.getmtime(filepath):
+            return None
+        size = os.path.getsize(sidecar)
+    except OSError:
+        return None
+    num_rows = pq.ParquetFile(filepath).metadata.num_rows
+    if num_rows == 0 or size != num_rows * 4 * len(SIDECAR_COLUMNS):
+        print("[!] Cached coordinates don't match the cleaned data. Rebuilding them.")
+        return None
+    arr = np.memmap(sidecar, dtype=np.float32, mode='r').reshape(-1, len(SIDECAR_COLUMNS))
+    return pd.DataFrame(arr, columns=SIDECAR_COLUMNS, copy=False)
+
+def _write_sidecar(df, filepath):
+    arr = np.column_stack([
+        df['Latitude'].to_numpy(dtype=np.float32),
+        df['Longitude'].to_numpy(dtype=np.float32),
+        severity_weights(df).astype(np.float32)
+    ])
+    # Write to a temp file and swap it in, so an interrupted write never
+    # leaves a truncated sidecar that looks fresh
+    sidecar = _sidecar_path(filepath)
+    arr.tofile(sidecar + '.tmp')
+    os.replace(sidecar + '.tmp', sidecar)
+
 def load_cleaned_data(filepath):
-    """Loads the pre-processed accident data."""
+    """
+    Loads the pre-processed accident data.
+    Later runs memory-map a float32 sidecar instead of re-reading the file.
+    """
     print(f"[*] Loading cleaned data from {filepath}...")
-    try:
-        df = pd.read_csv(filepath)
+    df = _load_sidecar(filepath)
+    if df is not None:
         return df
+    try:
+        if filepath.endswith('.parquet'):
+            # Columnar and typed: only the needed columns are read, nothing is re-parsed
+            df = pd.read_parquet(
+                filepath,
+                columns=MODEL_COLUMNS,
+                engine='pyarrow',
+                dtype_backend='pyarrow'
+            )
+        else:
+            df = pd.read_csv(
+                filepath,
+                usecols=MODEL_COLUMNS,
+                dtype=MODEL_DTYPES,
+                engine='pyarrow',
+                dtype_backend='pyarrow'
+            )
     except FileNotFoundError:
         print("[!] Error: Cleaned data not found. Run cleaner.py first.")
         return None
+    # Only Parquet has a cheap row count to validate the sidecar against,
+    # and np.memmap cannot map an empty file
+    if filepath.endswith('.parquet') and not df.empty:
+        _write_sidecar(df, filepath)
+    return df
+
+def severity_weights(df):
+    """
+    Per-accident severity weight, so cluster scores can be summed in one pass.
+    Fatal accidents are weighted 5x heavier than minor ones.
+    """
+    # Already computed when the data came from the memory-mapped sidecar
+    if 'Severity_Weight' in df.columns:
+        return df['Severity_Weight'].to_numpy(dtype=np.float64)
+    # (Assuming your dataset has a 'Severity' column)
+    # Severity is categorical: match the few distinct labels once, then broadcast by code
+    codes, labels = pd.factorize(df['Severity'])
+    labels = pd.Series(np.asarray(labels, dtype=object))
+    fatal = labels.str.contains('Fatal', case=False, na=False).to_numpy(dtype=bool)
+    minor = labels.str.contains('Minor|Damage', case=False, na=False).to_numpy(dtype=bool)
+    # Unknown = 2, Fatal = 2 + 3, Minor = 2 - 1; the trailing 2 is for missing (code -1)
+    label_weights = np.append(2.0 + 3.0 * fatal - 1.0 * minor, 2.0)
+    return label_weights[codes]
 
-def calculate_risk_score(cluster_data):
+def calculate_risk_score(weighted_scores):
     """
     Advanced Risk Scoring: Factors in Severity Weighting to avoid 
     penalizing high-volume expressways for minor fender-benders.
+    Takes the summed severity weight of each cluster.
     """
-    # 1. Separate accidents by severity
-    # (Assuming your dataset has a 'Severity' column)
-    fatal_crashes = len(cluster_data[cluster_data['Severity'].str.contains('Fatal', case=False, na=False)])
-    minor_crashes = len(cluster_data[cluster_data['Severity'].str.contains('Minor|Damage', case=False, na=False)])
-    unknown_crashes = len(cluster_data) - (fatal_crashes + minor_crashes)
+    # Determine Risk Tier based on the Weighted Score, not just volume
+    return np.select(
+        [weighted_scores >= 45, weighted_scores >= 25],
+        ["High", "Moderate"],   # Red, Orange
+        default="Low"           # Green
+    )
+
+def load_previous_centers(centroids_file, k):
+    """
+    Loads the centroids saved by the last run to warm-start K-Means.
+    Returns None (cold start) if there are none or K has changed.
+    """
+    try:
+        centers = pd.read_csv(centroids_file, usecols=['Latitude', 'Longitude'])
+    except (FileNotFoundError, ValueError):
+        return None
+    if len(centers) != k:
+        return None
+    return centers.to_numpy(dtype=np.float32)
+
+def _grid_cells(coordinates):
+    """
+    Collapses points that share a ~11m grid cell into one weighted point.
+    Returns (cell_coordinates, cell_counts, inverse), where inverse maps
+    every original point to its cell.
+    """
+    q = np.round(coordinates * GRID_SCALE).astype(np.int64)
+    keys = (q[:, 0] << 32) | (q[:, 1] & 0xFFFFFFFF)
+    _, inverse, cell_counts = np.unique(keys, return_inverse=True, return_counts=True)
+    
+    # Represent each cell by the mean of its points, not the grid corner
+    cells = np.empty((len(cell_counts), 2), dtype=np.float32)
+    for dim in range(2):
+        sums = np.bincount(inverse, weights=coordinates[:, dim], minlength=len(cell_counts))
+        cells[:, dim] = sums / cell_counts
+    return cells, cell_counts, inverse
+
+def _assign(X, xn, C):
+    """Returns (labels, squared distance of each point to its own center)."""
+    d = (C * C).sum(axis=1)[None, :] - 2.0 * np.dot(X, C.T)
+    labels = np.argmin(d, axis=1)
+    return labels, d[np.arange(len(X)), labels] + xn
+
+def _lloyd(X, C, iters=100, sample_weight=None):
+    """
+    Lloyd's algorithm with ||x - c||^2 expanded to ||x||^2 + ||c||^2 - 2x.c,
+    so each iteration is one BLAS matrix product plus an argmin.
+    Returns (centers, labels).
+    """
+    # Centre the data and work in float64: the expansion cancels catastrophically
+    # in float32 at lat/lon magnitudes
+    origin = X.mean(axis=0, dtype=np.float64)
+    X = X - origin
+    C = np.asarray(C, dtype=np.float64) - origin
+    xn = (X * X).sum(axis=1)
+    labels = None
+    for _ in range(iters):
+        new_labels, dist = _assign(X, xn, C)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        
+        # Move each center to the (weighted) mean of its points
+        counts = np.bincount(labels, weights=sample_weight, minlength=len(C))
+        filled = counts > 0
+        for dim in range(X.shape[1]):
+            weights = X[:, dim] if sample_weight is None else X[:, dim] * sample_weight
+            sums = np.bincount(labels, weights=weights, minlength=len(C))
+            C[filled, dim] = sums[filled] / counts[filled]
+        
+        # Like sklearn, re-seed empty clusters on the points farthest from their
+        # centers; left in place they would be saved as 0-crash black spots
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            farthest = np.argpartition(dist, -len(empty))[-len(empty):]
+            C[empty] = X[farthest]
+    else:
+        # Out of iterations: the labels must describe the final centers
+        labels, _ = _assign(X, xn, C)
+    return C + origin, labels
+
+def _fit_clusters(coordinates, k, init_centers=None):
+    """Returns (centroids, labels) for the given float32 coordinates."""
+    # Cluster one weighted point per grid cell, then map labels back to every accident
+    cells, cell_counts, inverse = _grid_cells(coordinates)
+    if len(cells) < k:
+        cells, cell_counts, inverse = coordinates, None, None
     
-    # 2. Apply Severity Weights
-    # Fatal accidents are weighted 5x heavier than minor ones
-    weighted_score = (fatal_crashes * 5) + (minor_crashes * 1) + (unknown_crashes * 2)
+    if init_centers is not None:
+        print("[*] Warm-starting from the previous run's centroids...")
     
-    # 3. Determine Risk Tier based on the Weighted Score, not just volume
-    if weighted_score >= 45:
-        return "High"      # Red
-    elif weighted_score >= 25:
-        return "Moderate"  # Orange
+    if k <= SMALL_K:
+        if init_centers is None:
+            init_centers, _ = kmeans_plusplus(
+                cells, k, sample_weight=cell_counts, random_state=42
+            )
+        centroids, labels = _lloyd(cells, init_centers, sample_weight=cell_counts)
     else:
-        return "Low"       # Green
+        # One k-means++ (or warm) start is enough on 2-D data; elkan skips most
+        # distance evaluations via the triangle inequality
+        kmeans = KMeans(
+            n_clusters=k,
+            init='k-means++' if init_centers is None else init_centers,
+            n_init=1,
+            algorithm='elkan',
+            max_iter=100,
+            random_state=42
+        )
+        labels = kmeans.fit_predict(cells, sample_weight=cell_counts)
+        centroids = kmeans.cluster_centers_
+    
+    if inverse is not None:
+        labels = labels[inverse]
+    return centroids, labels
 
-def identify_black_spots(df, k=10):
+def identify_black_spots(df, k=10, init_centers=None):
     """
-    Uses Scikit-Learn's K-Means to find accident hotspots.
+    Uses K-Means to find accident hotspots.
+    Pass the previous run's centroids as init_centers to warm-start.
+    Returns (centroids_df, labels); the input frame is left untouched.
     """
     print(f"[*] Running K-Means Clustering with K={k}...")
     
     # 1. Extract Latitude and Longitude into a 2D NumPy Array
     # Scikit-Learn requires this specific mathematical format to run efficiently
-    coordinates = df[['Latitude', 'Longitude']].to_numpy()
+    # float32 keeps ~1m precision on Indian lat/lon and halves the bytes K-Means moves
+    coordinates = df[['Latitude', 'Longitude']].to_numpy(dtype=np.float32, copy=False)
     
-    # 2. Initialize and Fit the Model
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    df['Cluster_ID'] = kmeans.fit_predict(coordinates)
+    # 2. Fit the Model and get the Centroids (The exact center of each 'Black Spot')
+    centroids, labels = _fit_clusters(coordinates, k, init_centers)
     
-    # 3. Get the Centroids (The exact center of each 'Black Spot')
-    centroids = kmeans.cluster_centers_
+    # 3. Tally every cluster in a single pass over the labels
+    counts = np.bincount(labels, minlength=k)
+    weighted_scores = np.bincount(labels, weights=severity_weights(df), minlength=k)
+    risk_levels = calculate_risk_score(weighted_scores)
     
-    # 4. Compile the final list of Black Spots with Risk Scores
-    black_spots = []
-    for i in range(k):
-        # Isolate the data for this specific cluster
-        cluster_points = df[df['Cluster_ID'] == i]
-        
-        # Calculate risk based on accident volume
-        risk_level = calculate_risk_score(cluster_points)
-        
-        # Store the centroid data
-        black_spots.append({
-            "Cluster_ID": i,
-            "Latitude": centroids[i][0],
-            "Longitude": centroids[i][1],
-            "Total_Crashes": len(cluster_points),
-            "Risk_Level": risk_level
-        })
+    # 4. Compile the final table of Black Spots with Risk Scores, column by column
+    black_spots = pd.DataFrame({
+        "Cluster_ID": np.arange(k),
+        "Latitude": centroids[:, 0],
+        "Longitude": centroids[:, 1],
+        "Total_Crashes": counts,
+        "Risk_Level": risk_levels
+    })
         
     print(f"[*] Successfully identified {k} black spots.")
-    return pd.DataFrame(black_spots), df
-
-def run_ml_pipeline(input_file, output_centroids_file, k=10):
-    """Executes the ML pipeline and saves the centroids."""
-    df = load_cleaned_data(input_file)
-    if df is None or df.empty:
-        return
+    return black_spots, labels
 
-    # Run the clustering algorithm
-    centroids_df, clustered_df = identify_black_spots(df, k=k)
+def run_clustering(df, output_centroids_file, k=10):
+    """Clusters already-loaded accident data and saves the centroids."""
+    # Run the clustering algorithm, starting from last run's centroids if present
+    init_centers = load_previous_centers(output_centroids_file, k)
+    centroids_df, _ = identify_black_spots(df, k=k, init_centers=init_centers)
     
     # Save the centroids for the Folium Map Generator to use
     os.makedirs(os.path.dirname(output_centroids_file), exist_ok=True)
-    centroids_df.to_csv(output_centroids_file, index=False)
+    # ~1m precision is plenty for the map and keeps the /api/clusters payload small
+    centroids_df.to_csv(output_centroids_file, index=False, float_format='%.5f')
     
     print(f"--- SUCCESS: Centroid 'Black Spots' saved to {output_centroids_file} ---")
 
+def run_ml_pipeline(input_file, output_centroids_file, k=10):
+    """Executes the ML pipeline and saves the centroids."""
+    df = load_cleaned_data(input_file)
+    if df is None or df.empty:
+        return
+    run_clustering(df, output_centroids_file, k=k)
+
 if __name__ == "__main__":
     # Dynamically set file paths
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     
     # Input: The clean file your Data Engineer made
-    clean_data_path = os.path.join(base_dir, 'data', 'processed', 'accidents_clean.csv')
+    clean_data_path = os.path.join(base_dir, 'data', 'processed', 'accidents_clean.parquet')
     
     # Output: The calculated centroids for your map
     centroids_data_path = os.path.join(base_dir, 'data', 'processed', 'cluster_centroids.csv')